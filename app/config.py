@@ -1,14 +1,8 @@
 # app/config.py
 
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from utils.settings import MCP_HOST, MCP_PORT, TOOL_BASE_URL  # noqa: F401 (TOOL_BASE_URL 재노출)
 
 # Streamlit 앱 설정
-HOST = os.getenv("MCP_HOST", "localhost")
-PORT = int(os.getenv("MCP_PORT", 8080))
+HOST = MCP_HOST
+PORT = MCP_PORT
 WS_URI = f"ws://{HOST}:{PORT}"
-
-# 툴 서버 설정 (예시)
-TOOL_BASE_URL = os.getenv("TOOL_BASE_URL", "http://localhost:8000/tools")
@@ -0,0 +1,57 @@
+# app/history.py
+#
+# 채팅 히스토리 파싱/렌더링 (streamlit 모듈은 인자로 받아서 씀 → 벤치마크에서 대체 가능)
+
+from typing import List, Optional
+
+TOOL_MARKER = "🔧 tool result:"
+
+# 한 번에 보여줄 최근 turn 수 / "이전 대화 더 보기" 한 번에 늘어나는 수
+PAGE_SIZE = 30
+
+
+def parse_turn(role: str, content: str) -> Optional[dict]:
+    """
+    메시지 하나 → 렌더링용 turn {"role", "kind", "body"}
+    kind 가 "tool" 이면 body 는 마커 뒤의 툴 결과 (이전과 같이 그대로 markdown 으로 그림).
+    화면에 안 그리는 role 은 None.
+    """
+    content = content.strip()
+
+    # 1) Tool result → expander only, wrapped in assistant bubble
+    if TOOL_MARKER in content:
+        body = content.split(TOOL_MARKER, 1)[1].strip()
+        return {"role": "assistant", "kind": "tool", "body": body}
+
+    # 2) Normal chat bubbles for user / assistant
+    if role in ("user", "assistant"):
+        return {"role": role, "kind": "chat", "body": content}
+    return None
+
+
+def append_turn(turns: List[dict], role: str, content: str) -> None:
+    turn = parse_turn(role, content)
+    if turn is not None:
+        turns.append(turn)
+
+
+def render_turn(st, turn: dict) -> None:
+    if turn["kind"] == "tool":
+        # wrap it in an assistant chat_message so the expander arrow shows up on the right
+        with st.chat_message("assistant"):
+            with st.expander("📚 출처 문서 보기", expanded=False):
+                st.markdown(turn["body"])
+        return
+
+    with st.chat_message(turn["role"]):
+        st.markdown(turn["body"])
+
+
+def render_history(st, turns: List[dict], window: int) -> int:
+    """
+    최근 window 개의 turn 만 그립니다. 화면에 안 그린 (더 이전) turn 수를 반환.
+    """
+    start = max(0, len(turns) - window)
+    for turn in turns[start:]:
+        render_turn(st, turn)
+    return start
@@ -11,12 +11,16 @@ import json
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from app.config import WS_URI
+from app.history import PAGE_SIZE, append_turn, render_history
 
 st.set_page_config(page_title="MCP-ChainBot", layout="wide")
 
 # 세션 상태 초기화
-if "history" not in st.session_state:
-    st.session_state.history = []
+# turns: 파싱이 끝난 {"role", "kind", "body"} 목록 (rerun 마다 다시 파싱하지 않음)
+if "turns" not in st.session_state:
+    st.session_state.turns = []
+if "window" not in st.session_state:
+    st.session_state.window = PAGE_SIZE
 if "registered" not in st.session_state:
     st.session_state.registered = False
 
@@ -61,33 +65,22 @@ user_input = st.chat_input("Your message...", key="chat_input")
 
 # 2) 입력이 들어오면 즉시 처리
 if user_input:
-    st.session_state.history.append({"role": "user", "content": user_input})
+    turns = st.session_state.turns
+    append_turn(turns, "user", user_input)
     response = asyncio.run(send_and_receive(user_input))
 
     if response.get("type") == "error":
-        st.session_state.history.append({"role": "assistant", "content": f"❌ {response['message']}"})
+        append_turn(turns, "assistant", f"❌ {response['message']}")
     elif response.get("type") == "chat_completion":
         for msg in response["messages"]:
-            st.session_state.history.append({"role": msg["role"], "content": msg["content"]})
+            append_turn(turns, msg["role"], msg["content"])
     else:
-        st.session_state.history.append({"role": "assistant", "content": str(response)})
+        append_turn(turns, "assistant", str(response))
 
 # ─── CHAT HISTORY RENDERING ──────────────────────────────────
-for turn in st.session_state.history:
-    role = turn["role"]
-    content = turn["content"].strip()
+# 최근 window 개만 그리고, 그 이전은 버튼으로 한 페이지씩 더 불러옴
+if len(st.session_state.turns) > st.session_state.window:
+    if st.button("⬆️ 이전 대화 더 보기", key="load_earlier"):
+        st.session_state.window += PAGE_SIZE
 
-    # 1) Tool result → expander only, wrapped in assistant bubble
-    if "🔧 tool result:" in content:
-        body = content.split("🔧 tool result:",1)[1].strip()
-        # wrap it in an assistant chat_message so the expander arrow shows up on the right
-        with st.chat_message("assistant"):
-            with st.expander("📚 출처 문서 보기", expanded=False):
-                st.markdown(body)
-        continue
-
-    # 2) Normal chat bubbles for user / assistant
-    if role in ("user", "assistant"):
-        with st.chat_message(role):
-            st.markdown(content)
-        continue
+render_history(st, st.session_state.turns, st.session_state.window)
@@ -0,0 +1,88 @@
+# benchmarks/bench_history_render.py
+#
+# Streamlit rerun 한 번에 드는 히스토리 렌더링 비용 (파이썬 쪽) 을 히스토리 길이별로 비교.
+#   legacy   : rerun 마다 전체 히스토리를 다시 파싱 + 전부 렌더링 (이전 main_app 방식)
+#   windowed : 미리 파싱된 turn 중 최근 PAGE_SIZE 개만 렌더링
+#   python benchmarks/bench_history_render.py
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.history import PAGE_SIZE, TOOL_MARKER, append_turn, render_history
+
+
+class FakeStreamlit:
+    """
+    st.chat_message / st.expander / st.markdown 호출만 흉내내는 렌더링 대상
+    """
+
+    def __init__(self):
+        self.elements = []
+
+    @contextmanager
+    def chat_message(self, role):
+        self.elements.append(("chat_message", role))
+        yield
+
+    @contextmanager
+    def expander(self, label, expanded=False):
+        self.elements.append(("expander", label))
+        yield
+
+    def markdown(self, body):
+        self.elements.append(("markdown", body))
+
+
+def make_history(n_turns: int) -> list:
+    history = []
+    tool_body = json.dumps({"city": "Seoul", "temp": 21.3, "description": "clear sky", "humidity": 40},
+                           ensure_ascii=False, indent=2)
+    for i in range(n_turns // 3):
+        history.append({"role": "user", "content": f"What's the weather in Seoul? ({i})"})
+        history.append({"role": "assistant", "content": f"{TOOL_MARKER}\n{tool_body}"})
+        history.append({"role": "assistant", "content": "It is clear and 21°C in Seoul. " * 5})
+    return history
+
+
+def legacy_rerun(st, history: list) -> None:
+    for turn in history:
+        role = turn["role"]
+        content = turn["content"].strip()
+        if TOOL_MARKER in content:
+            body = content.split(TOOL_MARKER, 1)[1].strip()
+            with st.chat_message("assistant"):
+                with st.expander("📚 출처 문서 보기", expanded=False):
+                    st.markdown(body)
+            continue
+        if role in ("user", "assistant"):
+            with st.chat_message(role):
+                st.markdown(content)
+
+
+def time_per_rerun(fn, reruns: int) -> float:
+    start = time.perf_counter()
+    for _ in range(reruns):
+        fn(FakeStreamlit())
+    return (time.perf_counter() - start) / reruns * 1000
+
+
+def main(reruns: int = 50):
+    print(f"{'turns':>8}{'legacy ms':>14}{'windowed ms':>14}{'speedup':>10}")
+    for n in (30, 300, 3000, 30000):
+        history = make_history(n)
+        turns = []
+        for t in history:
+            append_turn(turns, t["role"], t["content"])
+
+        legacy = time_per_rerun(lambda st: legacy_rerun(st, history), reruns)
+        windowed = time_per_rerun(lambda st: render_history(st, turns, PAGE_SIZE), reruns)
+        print(f"{n:>8}{legacy:>14.3f}{windowed:>14.3f}{legacy / windowed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_startup.py
+#
+# 콜드 스타트 시간 측정: 매 실행마다 새 파이썬 프로세스에서 import / Manager 생성.
+# --baseline 을 주면 그 git ref 의 트리를 임시 디렉터리에 풀어서 같은 항목을 나란히 측정합니다.
+#   python benchmarks/bench_startup.py [--runs 10] [--baseline <git ref>]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# 이름 → (현재 트리 코드, baseline 트리 코드)
+# 예전 트리에는 get_manager() 가 없고 import 시점에 Manager 를 만들었으므로 같은 작업량끼리 비교
+TARGETS = {
+    "import mcp.host": ("import mcp.host", "import mcp.host"),
+    "host + Manager": ("import mcp.host; mcp.host.get_manager()", "import mcp.host"),
+    "import tools.weather_server": ("import tools.weather_server", "import tools.weather_server"),
+    "import tools.exchange_server": ("import tools.exchange_server", "import tools.exchange_server"),
+    "import tools.wiki_server": ("import tools.wiki_server", "import tools.wiki_server"),
+    "import app.config": ("import app.config", "import app.config"),
+}
+
+
+def run_once(code: str, cwd: str):
+    """
+    새 프로세스 한 번의 실행 시간 (ms). import 가 실패하면 None
+    (예: 예전 weather_server 는 API 키가 없으면 import 에서 raise)
+    """
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", code], cwd=cwd,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if proc.returncode != 0:
+        return None
+    return (time.perf_counter() - start) * 1000
+
+
+def time_pair(code: str, baseline_code, runs: int, baseline_dir):
+    """
+    현재/baseline 을 번갈아 실행해서 (머신 부하 변화가 한쪽에만 몰리지 않도록) 각각의 중앙값 반환
+    """
+    current, before = [], []
+    for _ in range(runs):
+        current.append(run_once(code, PROJECT_ROOT))
+        if baseline_dir:
+            before.append(run_once(baseline_code, baseline_dir))
+
+    def median(samples):
+        return None if not samples or None in samples else statistics.median(samples)
+
+    return median(current), median(before)
+
+
+def export_tree(ref: str, dest: str) -> None:
+    archive = subprocess.run(["git", "archive", ref], cwd=PROJECT_ROOT, check=True, capture_output=True)
+    subprocess.run(["tar", "-x", "-C", dest], input=archive.stdout, check=True)
+
+
+def fmt(ms) -> str:
+    return "error" if ms is None else f"{ms:.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--baseline", help="git ref to compare against (e.g. a commit before the change)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as baseline_dir:
+        if args.baseline:
+            export_tree(args.baseline, baseline_dir)
+
+        bare, _ = time_pair("pass", None, args.runs, None)
+        print(f"bare python: {bare:.1f} ms (median of {args.runs})")
+        header = f"{'target':<32}{'current ms':>12}"
+        if args.baseline:
+            header += f"{'baseline ms':>14}{'saved ms':>10}"
+        print(header)
+
+        for name, (code, baseline_code) in TARGETS.items():
+            current, before = time_pair(code, baseline_code, args.runs,
+                                        baseline_dir if args.baseline else None)
+            row = f"{name:<32}{fmt(current):>12}"
+            if args.baseline:
+                saved = None if current is None or before is None else before - current
+                row += f"{fmt(before):>14}{fmt(saved):>10}"
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,21 @@
 # llm/groq_client.py
-import os
-import requests
-from dotenv import load_dotenv
+import json
 
-load_dotenv()  # .env 파일에서 API 키 불러오기
+from utils.settings import GROQ_API_KEY, GROQ_API_URL
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_MODEL = "llama-3.1-8b-instant"  # Groq에서 지원하는 모델 중 하나
 
-def call_llm(prompt: str):
-    headers = {
+def _headers() -> dict:
+    return {
         "Authorization": f"Bearer {GROQ_API_KEY}",
         "Content-Type": "application/json"
     }
 
+def call_llm(prompt: str):
+    import requests  # 첫 호출 때만 로드 (import 시간 절약)
+
     body = {
-        "model": "llama-3.1-8b-instant",  # Groq에서 지원하는 모델 중 하나
+        "model": GROQ_MODEL,
         "messages": [
             {"role": "system", "content": "You are a helpful assistant."},
             {"role": "user", "content": prompt}
@@ -23,6 +23,30 @@ def call_llm(prompt: str):
         "temperature": 0.7
     }
 
-    response = requests.post(GROQ_API_URL, headers=headers, json=body)
+    response = requests.post(GROQ_API_URL, headers=_headers(), json=body)
     response.raise_for_status()
     return response.json()["choices"][0]["message"]["content"]
+
+async def acall_llm_json(system_prompt: str, user_text: str, timeout: float = 10.0) -> dict:
+    """
+    JSON mode(response_format=json_object) 로 LLM 을 비동기 호출하고 파싱된 dict 반환.
+    이벤트 루프를 막지 않으므로 Manager 의 라우팅 단계에서 사용합니다.
+    """
+    import aiohttp
+
+    body = {
+        "model": GROQ_MODEL,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_text}
+        ],
+        "temperature": 0,
+        "response_format": {"type": "json_object"}
+    }
+
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(timeout=client_timeout) as session:
+        async with session.post(GROQ_API_URL, headers=_headers(), json=body) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+    return json.loads(data["choices"][0]["message"]["content"])
@@ -1,9 +1,9 @@
 # llm/llm_chain.py
 
 from typing import List
-from mcp.message_schema import ChatMessage, ChatCompletion, ToolInvocation
+from mcp.message_schema import ChatMessage
+from mcp.client import parse_llm_output
 from llm.groq_client import call_llm
-import json
 
 class LLMChain:
     """
@@ -20,13 +20,5 @@ class LLMChain:
     def run(self, history: List[ChatMessage]):
         prompt = self._format_history(history)
         raw = call_llm(prompt)
-        # LLM이 JSON tool 지시를 내렸으면 파싱
-        try:
-            obj = json.loads(raw)
-            if obj.get("type") == "tool_invocation":
-                return ToolInvocation.parse_obj(obj)
-        except Exception:
-            pass
-        # 아니면 일반 대화 응답
-        msg = ChatMessage(role="assistant", content=raw)
-        return ChatCompletion(type="chat_completion", messages=[msg])
+        # JSON tool 지시면 ToolInvocation, 아니면 일반 대화 응답
+        return parse_llm_output(raw)
@@ -2,9 +2,11 @@ import re, json
 
 from mcp.message_schema import A2AMessage, ChatMessage, ChatCompletion
 from urllib.parse import quote
-from aiohttp import ClientResponseError
 
 class BaseAgent:
+    # 동일한 ExecuteTool 동시 요청을 하나의 호출로 합칠 수 있는지 (mcp/singleflight.py)
+    single_flight = True
+
     def __init__(self, manager):
         self.manager = manager
         self.agent_id = self.__class__.__name__
@@ -14,6 +16,9 @@ class BaseAgent:
 
 
 class UserAgent(BaseAgent):
+    # ExecuteTool 을 다시 send_to_agent 로 중계하므로 합치면 자기 자신을 기다리게 됨
+    single_flight = False
+
     async def handle(self, msg: A2AMessage):
         if msg.type == "ExecuteTool":
             return await self.manager.send_to_agent(msg)
@@ -28,6 +33,7 @@ class UserAgent(BaseAgent):
             tool_text = f"🔧 tool result:\n{body}"
 
             # 2) LLM 히스토리에 assistant 메시지로 쌓기
+            await self.manager.page_in(msg.from_agent)
             hist = self.manager.histories.setdefault(msg.from_agent, [])
             hist.append(ChatMessage(role="system", content=tool_text))
 
@@ -60,6 +66,8 @@ class WeatherAgent(BaseAgent):
 
 class WikiAgent(BaseAgent):
     async def handle(self, msg: A2AMessage):
+        from aiohttp import ClientResponseError
+
         raw = msg.payload["query"]
         words = re.sub(r'[_\s]+', ' ', raw).strip().split()
         title = "_".join(w.capitalize() for w in words)
@@ -95,3 +103,32 @@ class ExchangeAgent(BaseAgent):
             to_agent=msg.from_agent,
             payload={"result": data}
         )
+
+
+class ToolAgent(BaseAgent):
+    """
+    전용 에이전트가 없는 툴 (servers.json 에 새로 추가되거나 register_agent 로 들어온 툴) 용.
+    to_agent 에 툴 이름을 넣은 ExecuteTool 의 payload 를 그대로 툴 인자로 넘깁니다.
+    """
+
+    def __init__(self, manager, tool: str):
+        super().__init__(manager)
+        self.agent_id = tool
+
+    async def handle(self, msg: A2AMessage):
+        data = await self.manager._invoke_tool(self.agent_id, msg.payload)
+        return A2AMessage(
+            type="ToolResult",
+            from_agent=self.agent_id,
+            to_agent=msg.from_agent,
+            payload={"result": data}
+        )
+
+
+# Manager 가 인스턴스를 만드는 에이전트 목록 (이름 → 클래스)
+AGENT_CLASSES = {
+    "UserAgent": UserAgent,
+    "WeatherAgent": WeatherAgent,
+    "WikiAgent": WikiAgent,
+    "ExchangeAgent": ExchangeAgent,
+}
@@ -13,6 +13,27 @@ from mcp.message_schema import (
 from llm.groq_client import call_llm
 from utils.logger import logger
 
+def parse_llm_output(raw: str) -> Union[ChatCompletion, ToolInvocation]:
+    """
+    LLM 원문 → ToolInvocation (JSON tool 지시인 경우) / ChatCompletion
+    Client.chat 과 LLMChain.run 이 공유합니다.
+    """
+    try:
+        payload = json.loads(raw)
+        # tool 호출 지시가 명확하면 ToolInvocation 으로 변환
+        if isinstance(payload, dict) and payload.get("type") == "tool_invocation":
+            return ToolInvocation.parse_obj(payload)
+    except json.JSONDecodeError:
+        # JSON이 아니거나 빈 응답 → 일반 채팅 응답으로 간주
+        pass
+    except ValidationError as e:
+        # JSON은 맞지만 schema 불일치 → 일반 채팅 응답
+        logger.debug(f"[Client] Payload not matching tool schema: {e}")
+
+    chat_msg = ChatMessage(role="assistant", content=raw)
+    return ChatCompletion(type="chat_completion", messages=[chat_msg])
+
+
 class Client:
     """
     LLM 호출 및 ToolInvocation 결과 처리용 클래스
@@ -39,20 +60,5 @@ class Client:
         raw = call_llm(prompt)
         logger.debug(f"[Client] Raw LLM response: {raw}")
 
-        # 3) LLM이 직접 반환한 JSON(tool call 지시 등)을 파싱
-        try:
-            payload = json.loads(raw)
-            # tool 호출 지시가 명확하면 ToolInvocation 으로 변환
-            if payload.get("type") == "tool_invocation":
-                tool_inv = ToolInvocation.parse_obj(payload)
-                return tool_inv
-        except json.JSONDecodeError:
-            # JSON이 아니거나 빈 응답 → 일반 채팅 응답으로 간주
-            pass
-        except ValidationError as e:
-            # JSON은 맞지만 schema 불일치 → 일반 채팅 응답
-            logger.debug(f"[Client] Payload not matching tool schema: {e}")
-
-        # 4) 일반 채팅 응답
-        chat_msg = ChatMessage(role="assistant", content=raw)
-        return ChatCompletion(type="chat_completion", messages=[chat_msg])
+        # 3) JSON tool 지시 / 일반 채팅 응답 구분
+        return parse_llm_output(raw)
@@ -0,0 +1,422 @@
+# mcp/conversation_log.py
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import MutableMapping
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from mcp.message_schema import ChatMessage
+from utils.logger import logger
+
+SEGMENT_RE = re.compile(r"^segment-(\d{8})\.jsonl$")
+SNAPSHOT_RE = re.compile(r"^snapshot-(\d{8})\.jsonl$")
+
+Turn = Tuple[str, str]  # (role, content)
+
+
+def _fsync_and_close(fd: int) -> None:
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class ConversationLog:
+    """
+    대화 기록용 append-only 로그 (디렉터리 하나).
+
+    - segment-NNNNNNNN.jsonl : 레코드 한 줄씩 append
+        {"a": agent_id, "op": "append" | "reset" | "drop", "m": [[role, content], ...]}
+    - snapshot-NNNNNNNN.jsonl : segment N 이전까지를 접은 상태, agent 당 한 줄
+        {"a": agent_id, "m": [[role, content], ...]}
+
+    레코드마다 write + flush 하므로 프로세스가 죽어도 OS 버퍼에는 남고,
+    fsync 는 fsync_every 건마다, 그리고 ConversationHistories.maintain() 이
+    fsync_interval 초마다 묶어서 합니다.
+    segment 가 segment_max_bytes 를 넘으면 새 segment 로 넘어가고,
+    스냅샷 이후 봉인된 segment 가 compact_after 개 쌓이면 (needs_compaction)
+    maintain() 이 executor 에서 새 스냅샷으로 접은 뒤 이전 segment/스냅샷을 지웁니다.
+
+    쓰기는 이벤트 루프 스레드에서만 하고, compact() / read_upto() 결과를 읽는 replay 는
+    executor 스레드에서 돌 수 있습니다. 봉인된 segment 는 바뀌지 않으므로
+    스냅샷 교체와 파일 삭제만 _lock 으로 보호합니다.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_max_bytes: int = 4 * 1024 * 1024,
+        fsync_every: int = 64,
+        fsync_interval: float = 1.0,
+        compact_after: int = 4,
+    ):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_after = compact_after
+        os.makedirs(directory, exist_ok=True)
+
+        self.snapshot_base = max(self._list(SNAPSHOT_RE), default=0)
+        # 재시작 시 마지막 segment 에 이어 쓰지 않고 새 segment 를 엽니다
+        # (마지막 줄이 잘려 있어도 다음 레코드와 섞이지 않도록)
+        self.active = max(self._list(SEGMENT_RE) + [self.snapshot_base - 1], default=-1) + 1
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+        self._open_active()
+        logger.info(f"[ConversationLog] Opened {directory} (snapshot={self.snapshot_base}, segment={self.active})")
+
+    # ─── 파일 이름 / 목록 ──────────────────────────────────────
+    def _list(self, pattern) -> List[int]:
+        nums = []
+        for name in os.listdir(self.directory):
+            m = pattern.match(name)
+            if m:
+                nums.append(int(m.group(1)))
+        return sorted(nums)
+
+    def _segment_path(self, n: int) -> str:
+        return os.path.join(self.directory, f"segment-{n:08d}.jsonl")
+
+    def _snapshot_path(self, n: int) -> str:
+        return os.path.join(self.directory, f"snapshot-{n:08d}.jsonl")
+
+    def _open_active(self) -> None:
+        self._file = open(self._segment_path(self.active), "a", encoding="utf-8")
+
+    # ─── 쓰기 ─────────────────────────────────────────────────
+    def _write(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        self._file.write(line + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        # 시간 기준 fsync 는 maintain() 이 executor 에서 하므로 여기서는 건수 기준만
+        if self._unsynced >= self.fsync_every:
+            self.sync()
+        if self._file.tell() >= self.segment_max_bytes:
+            self._roll()
+
+    def append(self, agent_id: str, turns: Iterable[Turn]) -> None:
+        self._write({"a": agent_id, "op": "append", "m": [list(t) for t in turns]})
+
+    def reset(self, agent_id: str, turns: Iterable[Turn] = ()) -> None:
+        self._write({"a": agent_id, "op": "reset", "m": [list(t) for t in turns]})
+
+    def drop(self, agent_id: str) -> None:
+        self._write({"a": agent_id, "op": "drop", "m": []})
+
+    def sync(self) -> None:
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    async def sync_async(self) -> None:
+        """
+        sync() 와 같지만 fsync 는 executor 에서.
+        dup 한 fd 를 쓰므로 그 사이 segment 가 넘어가 파일이 닫혀도 안전합니다.
+        """
+        if not self._unsynced or self._file is None:
+            self._last_sync = time.monotonic()
+            return
+        fd = os.dup(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        await asyncio.get_running_loop().run_in_executor(None, _fsync_and_close, fd)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def _roll(self) -> None:
+        # 봉인되는 segment 의 fsync 도 dup 한 fd 로 executor 에서 (루프가 없으면 그 자리에서)
+        fd = os.dup(self._file.fileno()) if self._unsynced else None
+        self._unsynced = 0
+        self._file.close()
+        self.active += 1
+        self._open_active()
+        if fd is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            _fsync_and_close(fd)
+        else:
+            loop.run_in_executor(None, _fsync_and_close, fd)
+
+    @property
+    def needs_compaction(self) -> bool:
+        # 재시작마다 새 segment 를 열기 때문에 열자마자 true 일 수도 있음
+        return self.active - self.snapshot_base >= self.compact_after
+
+    # ─── 읽기 / 리플레이 ───────────────────────────────────────
+    @staticmethod
+    def _apply(state: Dict[str, List[Turn]], record: dict) -> None:
+        agent_id, op = record["a"], record.get("op", "append")
+        turns = [tuple(t) for t in record.get("m", [])]
+        if op == "append":
+            state.setdefault(agent_id, []).extend(turns)
+        elif op == "reset":
+            state[agent_id] = turns
+        elif op == "drop":
+            state.pop(agent_id, None)
+
+    def _records(self, path: str, agent_id: Optional[str] = None, limit: Optional[int] = None) -> Iterable[dict]:
+        # agent_id 가 주어지면 문자열 비교로 먼저 걸러서 관련 없는 줄은 파싱하지 않음
+        # limit: 활성 segment 는 호출 시점까지 쓰인 바이트만 읽음 (다른 스레드에서 읽을 때)
+        needle = None
+        if agent_id is not None:
+            needle = '"a":' + json.dumps(agent_id, ensure_ascii=False) + ","
+        with open(path, "rb") as f:
+            data = f.read() if limit is None else f.read(limit)
+        # 레코드 구분자는 "\n" 뿐: str.splitlines() 는 ensure_ascii=False 로 그대로 남는
+        # U+2028 / U+2029 / U+0085 에서도 잘라 버리므로 바이트 단위로 나눔
+        for raw in data.split(b"\n"):
+            if not raw:
+                continue
+            line = raw.decode("utf-8", errors="replace")
+            if needle is not None and needle not in line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # 크래시로 잘린 마지막 줄
+                logger.warning(f"[ConversationLog] Skipping torn record in {path}")
+
+    def read_upto(self):
+        """
+        이벤트 루프 스레드에서 호출: 지금까지 쓴 내용의 경계 (활성 segment 번호, 바이트 수)
+        이 값을 replay() 에 넘기면 다른 스레드에서도 일관된 시점을 읽습니다.
+        """
+        self._file.flush()
+        return self.active, self._file.tell()
+
+    def replay(self, agent_id: Optional[str] = None, upto=None) -> Dict[str, List[Turn]]:
+        """
+        스냅샷 + 이후 segment 를 접은 상태. executor 스레드에서 호출해도 됩니다.
+        """
+        active, limit = upto if upto is not None else self.read_upto()
+        state: Dict[str, List[Turn]] = {}
+        with self._lock:
+            base = self.snapshot_base
+            if base and os.path.exists(self._snapshot_path(base)):
+                for rec in self._records(self._snapshot_path(base), agent_id):
+                    state[rec["a"]] = [tuple(t) for t in rec["m"]]
+            for n in self._list(SEGMENT_RE):
+                if n < base or n > active:
+                    continue
+                path = self._segment_path(n)
+                for rec in self._records(path, agent_id, limit if n == active else None):
+                    self._apply(state, rec)
+        return state
+
+    def load(self, agent_id: str, upto=None) -> Optional[List[Turn]]:
+        """
+        agent_id 하나의 대화만 스냅샷 + 이후 segment 에서 복원. 기록이 없으면 None.
+        """
+        return self.replay(agent_id, upto).get(agent_id)
+
+    def compact(self) -> None:
+        """
+        현재 활성 segment 이전까지를 새 스냅샷으로 접고 오래된 파일을 지웁니다.
+        봉인된 파일만 읽으므로 executor 스레드에서 돌려도 되며,
+        스냅샷 교체/삭제 순간에만 lock 을 잡습니다.
+        """
+        base = self.active
+        state: Dict[str, List[Turn]] = {}
+        old_snapshot = self.snapshot_base
+        if old_snapshot and os.path.exists(self._snapshot_path(old_snapshot)):
+            for rec in self._records(self._snapshot_path(old_snapshot)):
+                state[rec["a"]] = [tuple(t) for t in rec["m"]]
+        sealed = [n for n in self._list(SEGMENT_RE) if old_snapshot <= n < base]
+        for n in sealed:
+            for rec in self._records(self._segment_path(n)):
+                self._apply(state, rec)
+
+        tmp = self._snapshot_path(base) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for agent_id, turns in state.items():
+                rec = {"a": agent_id, "m": [list(t) for t in turns]}
+                f.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        with self._lock:
+            os.replace(tmp, self._snapshot_path(base))
+            self.snapshot_base = base
+            for n in sealed:
+                os.remove(self._segment_path(n))
+            if old_snapshot and os.path.exists(self._snapshot_path(old_snapshot)):
+                os.remove(self._snapshot_path(old_snapshot))
+        logger.info(f"[ConversationLog] Compacted {len(sealed)} segment(s) into snapshot {base}")
+
+
+class LoggedHistory(list):
+    """
+    append / extend 가 ConversationLog 에 그대로 기록되는 대화 히스토리.
+    (그 외의 in-place 수정은 기록되지 않으니 필요하면 histories[agent_id] = [...] 로 교체)
+    """
+
+    def __init__(self, log: ConversationLog, agent_id: str, messages: Iterable[ChatMessage] = ()):
+        super().__init__(messages)
+        self._log = log
+        self._agent_id = agent_id
+
+    def append(self, msg: ChatMessage) -> None:
+        self._log.append(self._agent_id, [(msg.role, msg.content)])
+        super().append(msg)
+
+    def extend(self, msgs: Iterable[ChatMessage]) -> None:
+        msgs = list(msgs)
+        self._log.append(self._agent_id, [(m.role, m.content) for m in msgs])
+        super().extend(msgs)
+
+
+class ConversationHistories(MutableMapping):
+    """
+    Manager.histories 대체용 dict: 로그에 write-through 하고,
+    메모리에 없는 agent_id 는 로그에서 리플레이합니다.
+    - 비동기 코드는 먼저 `await page_in(agent_id)` 로 executor 에서 리플레이해 두면
+      이후의 동기 접근은 메모리에서 끝납니다 (page_in 없이 접근하면 그 자리에서 리플레이).
+    - maintain() 백그라운드 루프가 주기적 fsync, compaction,
+      idle_seconds 동안 안 쓰인 대화를 메모리에서 내리는 일을 합니다 (로그에는 남음).
+    iteration / len 은 현재 메모리에 올라와 있는 대화만 대상으로 합니다.
+    """
+
+    def __init__(self, log: ConversationLog, idle_seconds: Optional[float] = 600.0):
+        self.log = log
+        self.idle_seconds = idle_seconds
+        self._loaded: Dict[str, LoggedHistory] = {}
+        self._last_used: Dict[str, float] = {}
+        # 로그에 기록이 없다고 확인된 agent_id (다음 접근 때 동기 리플레이를 피하기 위한 negative cache)
+        self._missing: set = set()
+
+    def _install(self, agent_id: str, turns: List[Turn]) -> LoggedHistory:
+        messages = [ChatMessage(role=role, content=content) for role, content in turns]
+        hist = LoggedHistory(self.log, agent_id, messages)
+        self._loaded[agent_id] = hist
+        logger.debug(f"[ConversationLog] Replayed {len(messages)} message(s) for {agent_id}")
+        return hist
+
+    async def page_in(self, agent_id: str) -> None:
+        if agent_id in self._loaded:
+            self._last_used[agent_id] = time.monotonic()
+            return
+        upto = self.log.read_upto()
+        loop = asyncio.get_running_loop()
+        turns = await loop.run_in_executor(None, self.log.load, agent_id, upto)
+        # 기다리는 동안 다른 요청이 먼저 올렸거나 reset 했으면 그쪽이 최신
+        if agent_id in self._loaded:
+            return
+        if turns is None:
+            self._missing.add(agent_id)
+        else:
+            self._install(agent_id, turns)
+            self._last_used[agent_id] = time.monotonic()
+
+    def _load(self, agent_id: str) -> Optional[List[Turn]]:
+        if agent_id in self._missing:
+            return None
+        turns = self.log.load(agent_id)
+        if turns is None:
+            self._missing.add(agent_id)
+        return turns
+
+    def __getitem__(self, agent_id: str) -> LoggedHistory:
+        hist = self._loaded.get(agent_id)
+        if hist is None:
+            turns = self._load(agent_id)
+            if turns is None:
+                raise KeyError(agent_id)
+            hist = self._install(agent_id, turns)
+        self._last_used[agent_id] = time.monotonic()
+        return hist
+
+    def __setitem__(self, agent_id: str, messages: List[ChatMessage]) -> None:
+        messages = list(messages)
+        self.log.reset(agent_id, [(m.role, m.content) for m in messages])
+        self._loaded[agent_id] = LoggedHistory(self.log, agent_id, messages)
+        self._last_used[agent_id] = time.monotonic()
+        self._missing.discard(agent_id)
+
+    def __delitem__(self, agent_id: str) -> None:
+        self.pop(agent_id)
+
+    def pop(self, agent_id: str, *default):
+        # 메모리에 없으면 (paged out) 로그에서 확인한 뒤에만 drop 레코드를 남김
+        # (비동기 코드는 page_in 을 먼저 해 두면 여기서 동기 리플레이가 일어나지 않음)
+        if agent_id in self._loaded:
+            value = self._loaded.pop(agent_id)
+        else:
+            turns = self._load(agent_id)
+            if turns is None:
+                if default:
+                    return default[0]
+                raise KeyError(agent_id)
+            value = [ChatMessage(role=role, content=content) for role, content in turns]
+        self.log.drop(agent_id)
+        self._last_used.pop(agent_id, None)
+        self._missing.add(agent_id)
+        return value
+
+    def setdefault(self, agent_id: str, default: Optional[List[ChatMessage]] = None) -> LoggedHistory:
+        # MutableMapping.setdefault 는 default 객체를 그대로 돌려주므로
+        # write-through 되는 LoggedHistory 를 돌려주도록 재정의
+        try:
+            return self[agent_id]
+        except KeyError:
+            self[agent_id] = default or []
+            return self._loaded[agent_id]
+
+    def __iter__(self):
+        return iter(list(self._loaded))
+
+    def __len__(self) -> int:
+        return len(self._loaded)
+
+    def evict_idle(self, max_idle: float) -> int:
+        """
+        max_idle 초 이상 안 쓰인 대화를 메모리에서 내리고 개수 반환
+        (레코드는 이미 로그에 flush 돼 있으므로 fsync 없이 버려도 됨)
+        """
+        now = time.monotonic()
+        idle = [a for a, t in self._last_used.items() if now - t >= max_idle]
+        for agent_id in idle:
+            self._loaded.pop(agent_id, None)
+            self._last_used.pop(agent_id, None)
+        # negative cache 가 한없이 커지지 않도록 함께 비움
+        self._missing.clear()
+        if idle:
+            logger.debug(f"[ConversationLog] Paged out {len(idle)} idle conversation(s)")
+        return len(idle)
+
+    async def maintain(self) -> None:
+        """
+        Host 에서 백그라운드 태스크로 돌리는 루프 (registry.watch 와 같은 방식):
+        fsync_interval 마다 fsync, 필요하면 compaction, 가끔 idle 대화 정리.
+        무거운 작업은 모두 executor 에서 돌아서 이벤트 루프를 막지 않습니다.
+        """
+        loop = asyncio.get_running_loop()
+        last_sweep = time.monotonic()
+        while True:
+            # 한 번 실패해도 루프가 끝나지 않도록
+            try:
+                await self.log.sync_async()
+                if self.log.needs_compaction:
+                    await loop.run_in_executor(None, self.log.compact)
+                if self.idle_seconds is not None and time.monotonic() - last_sweep >= self.idle_seconds / 2:
+                    last_sweep = time.monotonic()
+                    self.evict_idle(self.idle_seconds)
+            except Exception:
+                logger.exception("[ConversationLog] Maintenance iteration failed")
+            await asyncio.sleep(self.log.fsync_interval)
+
+    def close(self) -> None:
+        self.log.close()
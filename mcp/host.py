@@ -2,16 +2,29 @@
 
 import asyncio
 import json
-import websockets
 from pydantic import parse_obj_as, ValidationError
 
-from mcp.manager import Manager
 from mcp.message_schema import MCPMessage
 from utils.logger import logger
+from utils.settings import MCP_HOST, MCP_PORT
 
-manager = Manager()
+_manager = None
+
+def get_manager():
+    """
+    Manager 는 첫 사용 시점에 생성합니다.
+    (import 만 하는 테스트/스크립트가 servers.json 로딩 등의 비용을 치르지 않도록)
+    """
+    global _manager
+    if _manager is None:
+        from mcp.manager import Manager
+        _manager = Manager()
+    return _manager
 
 async def handler(websocket, path=None):
+    from websockets.exceptions import ConnectionClosedOK
+
+    manager = get_manager()
     logger.info(f"[Host] Client connected")
     try:
         async for raw in websocket:
@@ -55,15 +68,28 @@ async def handler(websocket, path=None):
             logger.debug(f"[Host] Sending response: {resp_json}")
             await websocket.send(resp_json)
 
-    except websockets.exceptions.ConnectionClosedOK:
+    except ConnectionClosedOK:
         logger.info(f"[Host] Client disconnected gracefully")
     except Exception as e:
         logger.exception(f"[Host] Unexpected error in handler: {e}")
 
-async def run_host(host: str = "localhost", port: int = 8080):
+async def run_host(host: str = MCP_HOST, port: int = MCP_PORT):
+    import websockets
+
+    manager = get_manager()
     logger.info(f"[Host] Starting MCP Host at ws://{host}:{port}")
-    async with websockets.serve(handler, host, port):
-        await asyncio.Future()  # run forever
+    # servers.json 변경 감지 + 툴 서버 헬스 체크, 대화 로그 fsync/compaction
+    background = [
+        asyncio.create_task(manager.registry.watch()),
+        asyncio.create_task(manager.maintain()),
+    ]
+    try:
+        async with websockets.serve(handler, host, port):
+            await asyncio.Future()  # run forever
+    finally:
+        for task in background:
+            task.cancel()
+        manager.close()
 
 if __name__ == "__main__":
     asyncio.run(run_host())
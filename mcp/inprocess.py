@@ -0,0 +1,63 @@
+# mcp/inprocess.py
+
+import importlib
+import inspect
+from functools import lru_cache
+from typing import Any, Callable, Tuple, get_type_hints
+
+from aiohttp import ClientResponseError, RequestInfo
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from multidict import CIMultiDict, CIMultiDictProxy
+from pydantic import ValidationError
+from yarl import URL
+
+from utils.logger import logger
+
+
+@lru_cache(maxsize=None)
+def load_handler(ref: str) -> Tuple[Callable, Any]:
+    """
+    "tools.weather_server:weather_invoke" → (handler, request model)
+    요청 모델은 FastAPI 와 마찬가지로 첫 번째 인자의 타입 힌트에서 가져옵니다.
+    """
+    module_name, _, attr = ref.partition(":")
+    if not attr:
+        raise RuntimeError(f"Invalid in-process handler reference `{ref}` (expected module:function)")
+    handler = getattr(importlib.import_module(module_name), attr)
+    first_param = next(iter(inspect.signature(handler).parameters))
+    model = get_type_hints(handler)[first_param]
+    logger.info(f"[InProcess] Loaded handler {ref} ({model.__name__})")
+    return handler, model
+
+
+def _response_error(ref: str, status: int, message: str) -> ClientResponseError:
+    # HTTP 모드의 resp.raise_for_status() 와 같은 예외 타입/상태 코드로 맞춰줌
+    # ("module:function" 을 그대로 URL 에 넣으면 yarl 이 ":" 뒤를 포트로 읽으므로 나눠서 구성)
+    module_name, _, attr = ref.partition(":")
+    url = URL.build(scheme="inprocess", host=module_name, path="/" + attr)
+    info = RequestInfo(url, "POST", CIMultiDictProxy(CIMultiDict()))
+    return ClientResponseError(info, (), status=status, message=message)
+
+
+async def invoke_inprocess(ref: str, args: dict) -> Any:
+    """
+    툴 핸들러를 HTTP 없이 직접 호출합니다.
+    - 요청 검증 실패 → 422, HTTPException → 해당 status 의 ClientResponseError
+    - 응답은 FastAPI 가 직렬화하는 것과 같은 JSON 호환 dict 로 변환
+    """
+    handler, model = load_handler(ref)
+    try:
+        req = model.model_validate(args)
+    except ValidationError as e:
+        raise _response_error(ref, 422, str(e))
+
+    try:
+        result = await handler(req)
+    except HTTPException as e:
+        raise _response_error(ref, e.status_code, str(e.detail))
+    except Exception as e:
+        logger.exception(f"[InProcess] Unhandled error in {ref}")
+        raise _response_error(ref, 500, str(e))
+
+    return jsonable_encoder(result)
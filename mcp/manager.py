@@ -2,13 +2,12 @@
 
 import json
 import os
-import re
 from typing import Dict, List
 
-import aiohttp
 from mcp.message_schema import (
     MCPMessage,
     RegisterAgent,
+    DeregisterAgent,
     ChatCompletion,
     ChatMessage,
     ToolInvocation,
@@ -17,50 +16,71 @@ from mcp.message_schema import (
 )
 
 from mcp.client import Client
-from mcp.agents import UserAgent, WeatherAgent, WikiAgent, ExchangeAgent
+from mcp.agents import AGENT_CLASSES, ToolAgent
+from mcp.registry import ToolRegistry
+from mcp.router import ToolRouter
+from mcp.singleflight import SingleFlight, a2a_key
 from utils.logger import logger
-
-
-def clean_query(text: str) -> str:
-        # 1. 소문자로 변환 후 관사 제거
-        text = text.lower()
-        text = re.sub(r'^(the|a|an)\s+', '', text)
-
-        # 2. 남은 특수문자 제거 및 공백 → `_` 변환
-        text = re.sub(r'[^\w\s]', '', text)
-        return text.strip().replace(' ', '_')
+from utils.settings import CONVERSATION_LOG_DIR, HISTORY_IDLE_SECONDS
 
 
 class Manager:
     def __init__(self, server_list_path: str = None):
-        # Load tool endpoints and spawn CLI servers
+        # Load tool endpoints (servers.json 은 registry 가 감시하며 hot reload)
         server_list_path = server_list_path or os.path.join(
             os.path.dirname(__file__), "servers.json"
         )
-        with open(server_list_path, "r", encoding="utf-8") as f:
-            servers = json.load(f)
+        self.registry = ToolRegistry(server_list_path)
 
-        # Build tool_endpoints map
-        self.tool_endpoints: Dict[str, str] = {}
-        for s in servers:
-            proto = "https" if s.get("secure") else "http"
-            url = f"{proto}://{s['host']}:{s['port']}{s['path']}"
-            self.tool_endpoints[s["tool"]] = url
+        # Conversation histories (LLM client 는 첫 호출 때 생성)
+        self.histories: Dict[str, List[ChatMessage]] = self._open_histories()
+        self._client = None
+        self.router = ToolRouter()
+        self.singleflight = SingleFlight()
 
-        logger.info(f"[Manager] Loaded tool endpoints: {self.tool_endpoints}")
+        # 1) 에이전트 인스턴스 생성 & registry
+        self.agents = {name: cls(self) for name, cls in AGENT_CLASSES.items()}
 
-        # Conversation histories and LLM client
-        self.histories: Dict[str, List[ChatMessage]] = {}
-        self.client = Client()
+    @staticmethod
+    def _open_histories():
+        """
+        CONVERSATION_LOG_DIR 가 설정돼 있으면 append-only 로그에 write-through 하고
+        agent_id 별로 필요할 때 리플레이하는 dict, 아니면 일반 dict
+        """
+        if not CONVERSATION_LOG_DIR:
+            return {}
+        from mcp.conversation_log import ConversationLog, ConversationHistories
+        return ConversationHistories(
+            ConversationLog(CONVERSATION_LOG_DIR), idle_seconds=HISTORY_IDLE_SECONDS
+        )
 
-        # 1) 에이전트 인스턴스 생성 & registry
-        self.agents = {
-            "UserAgent": UserAgent(self),
-            "WeatherAgent": WeatherAgent(self),
-            "WikiAgent": WikiAgent(self),
-            "ExchangeAgent": ExchangeAgent(self),
-        }
-        
+    async def page_in(self, agent_id: str) -> None:
+        """
+        로그 기반 histories 면 agent_id 의 대화를 executor 에서 미리 리플레이
+        (이후 self.histories 동기 접근이 이벤트 루프를 막지 않도록)
+        """
+        if hasattr(self.histories, "page_in"):
+            await self.histories.page_in(agent_id)
+
+    async def maintain(self) -> None:
+        # 대화 로그 fsync / compaction / idle 대화 정리 (로그를 안 쓰면 할 일 없음)
+        if hasattr(self.histories, "maintain"):
+            await self.histories.maintain()
+
+    def close(self) -> None:
+        # 대화 로그 fsync + 파일 닫기
+        if hasattr(self.histories, "close"):
+            self.histories.close()
+
+    @property
+    def client(self) -> Client:
+        if self._client is None:
+            self._client = Client()
+        return self._client
+
+    @property
+    def tool_endpoints(self) -> Dict[str, List[str]]:
+        return self.registry.snapshot()
 
     async def send_to_agent(self, a2a_msg: A2AMessage) -> MCPMessage:
         """
@@ -70,9 +90,16 @@ class Manager:
         - ChatCompletion 이면 반환
         """
         agent = self.agents.get(a2a_msg.to_agent)
+        if not agent and a2a_msg.to_agent in self.registry.endpoints:
+            # 전용 에이전트가 없는 툴은 툴 이름으로 바로 호출
+            agent = ToolAgent(self, a2a_msg.to_agent)
         if not agent:
             raise RuntimeError(f"No such agent: {a2a_msg.to_agent}")
-        resp = await agent.handle(a2a_msg)
+        if a2a_msg.type == "ExecuteTool" and agent.single_flight:
+            # 동시에 들어온 같은 툴 요청은 한 번만 실행하고 결과를 나눠 받음
+            resp = await self.singleflight.do(a2a_key(a2a_msg), lambda: agent.handle(a2a_msg))
+        else:
+            resp = await agent.handle(a2a_msg)
         # 만약 응답이 또 A2AMessage 라면 순환 처리
         if isinstance(resp, A2AMessage):
             return await self.handle_message(resp)
@@ -87,86 +114,34 @@ class Manager:
         return ChatCompletion(type="chat_completion", messages=chat_msgs)
 
     async def handle_message(self, msg: MCPMessage) -> MCPMessage:
-        # 1) RegisterAgent 시 UserAgent 등록
+        # 1) RegisterAgent: 툴 서버면 registry 에, 아니면 UserAgent 대화 등록
         if isinstance(msg, RegisterAgent):
-            self.histories[msg.agent_id] = []
+            if msg.tool and msg.endpoint:
+                self.registry.register(msg.tool, msg.endpoint, health_url=msg.health_url)
+            else:
+                self.histories[msg.agent_id] = []
+            return msg
+
+        if isinstance(msg, DeregisterAgent):
+            if msg.tool:
+                self.registry.deregister(msg.tool, msg.endpoint)
+            else:
+                await self.page_in(msg.agent_id)
+                self.histories.pop(msg.agent_id, None)
             return msg
 
         # 2) ChatCompletion → UserAgent로 변환
         if isinstance(msg, ChatCompletion):
 
-            user_text = msg.messages[-1].content.lower()
-
-            # —— WeatherAgent 호출 —— #
-            if "weather in" in user_text:
-                raw = msg.messages[-1].content
-                city = raw.split("weather in")[-1].strip()
-                city = city.rstrip("?!.").strip()
-                a2a = A2AMessage(
-                    type="ExecuteTool",
-                    from_agent="UserAgent",
-                    to_agent="WeatherAgent",
-                    payload={"city": city}
-                )
-                return await self.send_to_agent(a2a)
-            
-            # —— WikiAgent 호출 —— #
-            if any(user_text.startswith(k) for k in ("tell me about", "who is", "what is")) or "from wikipedia" in user_text:
-                # 1) 엔티티 이름 정리
-                raw_query = re.sub(
-                    r'^(tell me about|who is|what is)\s+',
-                    '',
-                    user_text.rstrip(' ?!'),
-                    flags=re.IGNORECASE
-                )
-                query = clean_query(raw_query)
-                logger.info(f"[Manager] A2A wiki invoke for {query}")
-
-                # 2) A2A 메시지 생성 & 전송
-                a2a = A2AMessage(
-                    type="ExecuteTool",
-                    from_agent="UserAgent",
-                    to_agent="WikiAgent",
-                    payload={"query": query}
-                )
-                return await self.send_to_agent(a2a)
-            
-            # —— ExchangeAgent 호출 —— #
-            if "exchange rate" in user_text:
-                txt_clean = user_text.rstrip('?.!')
-                base = symbol = None
-
-                # 1) "from USD to KRW"
-                m = re.search(r'from\s+([a-z]{3})\s+to\s+([a-z]{3})', txt_clean)
-                if m:
-                    base, symbol = m.group(1).upper(), m.group(2).upper()
-
-                # 2) "USD to KRW"
-                elif re.search(r'([a-z]{3})\s+to\s+([a-z]{3})', txt_clean):
-                    m2 = re.search(r'([a-z]{3})\s+to\s+([a-z]{3})', txt_clean)
-                    base, symbol = m2.group(1).upper(), m2.group(2).upper()
-
-                # 3) "in korea" 스타일
-                elif re.search(r'in\s+([a-z\s]+)', txt_clean):
-                    country = re.search(r'in\s+([a-z\s]+)', txt_clean).group(1).strip()
-                    country_map = {
-                        "korea": "KRW", "south korea": "KRW",
-                        "japan": "JPY", "china": "CNY",
-                        "us": "USD", "usa": "USD",
-                        "europe": "EUR", "uk": "GBP", "canada": "CAD"
-                    }
-                    if country in country_map:
-                        base, symbol = "USD", country_map[country]
-
-                # 4) 기본값
-                if base is None or symbol is None:
-                    base, symbol = "USD", "KRW"
-                    
+            # 로컬 규칙 → (애매하면) 캐시/LLM 순으로 툴 선택
+            decision = await self.router.route(msg.messages[-1].content)
+            if decision is not None:
+                logger.info(f"[Manager] A2A {decision.agent} invoke with {decision.payload}")
                 a2a = A2AMessage(
                     type="ExecuteTool",
                     from_agent="UserAgent",
-                    to_agent="ExchangeAgent",
-                    payload={"base": base, "symbol": symbol}
+                    to_agent=decision.agent,
+                    payload=decision.payload
                 )
                 return await self.send_to_agent(a2a)
 
@@ -184,6 +159,7 @@ class Manager:
             result = await self._invoke_tool(msg.tool_name, msg.args)
             resp = ToolResponse(type="tool_response", tool_name=msg.tool_name, result=result)
             agent_id = getattr(msg, "agent_id", "default")
+            await self.page_in(agent_id)
             self.histories.setdefault(agent_id, []).append(
                 ChatMessage(role="assistant", content=json.dumps(result))
             )
@@ -192,6 +168,7 @@ class Manager:
         # 5) ToolResponse: add to history and re-query LLM
         if isinstance(msg, ToolResponse):
             agent_id = getattr(msg, "agent_id", "default")
+            await self.page_in(agent_id)
             self.histories.setdefault(agent_id, []).append(
                 ChatMessage(role="tool", content=json.dumps(msg.result))
             )
@@ -206,12 +183,21 @@ class Manager:
 
     async def _invoke_tool(self, tool_name: str, args: dict) -> dict:
         """
-        Dynamically route to whichever tool server is in servers.json
+        Route to the least-loaded healthy replica of `tool_name` in the registry
         """
-        if tool_name not in self.tool_endpoints:
-            raise RuntimeError(f"No endpoint configured for tool `{tool_name}`")
-        url = self.tool_endpoints[tool_name]
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=args) as resp:
-                resp.raise_for_status()
-                return await resp.json()
\ No newline at end of file
+        async with self.registry.acquire(tool_name) as ep:
+            # 같은 프로세스에 있는 툴이면 HTTP 왕복 없이 핸들러 직접 호출
+            if ep.transport == "inprocess":
+                from mcp.inprocess import invoke_inprocess
+                return await invoke_inprocess(ep.handler, args)
+
+            import aiohttp
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.post(ep.url, json=args) as resp:
+                        resp.raise_for_status()
+                        return await resp.json()
+            except aiohttp.ClientConnectionError:
+                # 연결 자체가 안 되면 다음 헬스 체크 전까지 후보에서 제외
+                self.registry.mark_unhealthy(ep)
+                raise
@@ -1,11 +1,20 @@
 # mcp/message_schema.py
 
 from pydantic import BaseModel, Field
-from typing import Literal, Dict, Any, List, Union
+from typing import Literal, Dict, Any, List, Optional, Union
 
 class RegisterAgent(BaseModel):
     type: Literal["register_agent"]
     agent_id: str = Field(..., description="Unique identifier for this agent")
+    tool: Optional[str] = Field(None, description="Tool name, when a tool server registers itself")
+    endpoint: Optional[str] = Field(None, description="Invoke URL of the registering tool server")
+    health_url: Optional[str] = Field(None, description="Optional health check URL")
+
+class DeregisterAgent(BaseModel):
+    type: Literal["deregister_agent"]
+    agent_id: str
+    tool: Optional[str] = None
+    endpoint: Optional[str] = Field(None, description="Replica to remove; all replicas of the tool if omitted")
 
 class ToolInvocation(BaseModel):
     type: Literal["tool_invocation"]
@@ -26,7 +35,7 @@ class ChatCompletion(BaseModel):
     messages: List[ChatMessage]
 
 # 예시: MCP 전체 메시지 타입 유니언
-MCPMessage = Union[RegisterAgent, ToolInvocation, ToolResponse, ChatCompletion]
+MCPMessage = Union[RegisterAgent, DeregisterAgent, ToolInvocation, ToolResponse, ChatCompletion]
 
 class A2AMessage(BaseModel):
     type: Literal["ExecuteTool", "ToolResult"]
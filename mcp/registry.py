@@ -0,0 +1,282 @@
+# mcp/registry.py
+
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from utils.logger import logger
+
+
+def endpoint_url(spec: dict) -> str:
+    """
+    servers.json 항목 하나 → 툴 서버 URL
+    (in-process 항목은 "inprocess://module:function")
+    """
+    if spec.get("transport") == "inprocess":
+        return f"inprocess://{spec['handler']}"
+    proto = "https" if spec.get("secure") else "http"
+    return f"{proto}://{spec['host']}:{spec['port']}{spec['path']}"
+
+
+def expand_replicas(spec: dict) -> List[dict]:
+    """
+    "replicas": [{"host": ..., "port": ...}, ...] 가 있으면
+    기본 항목 위에 덮어써서 replica 별 spec 리스트로 펼칩니다.
+    """
+    replicas = spec.get("replicas")
+    if not replicas:
+        return [spec]
+    base = {k: v for k, v in spec.items() if k != "replicas"}
+    return [{**base, **r} for r in replicas]
+
+
+class Endpoint:
+    """
+    한 툴의 replica 하나: 주소 + 헬스 상태 + 진행 중인 요청 수
+    """
+
+    def __init__(self, tool: str, url: str, source: str = "config", health_url: Optional[str] = None,
+                 transport: str = "http", handler: Optional[str] = None):
+        self.tool = tool
+        self.url = url
+        self.transport = transport    # "http" 또는 "inprocess"
+        self.handler = handler        # inprocess 일 때 "module:function"
+        self.source = source          # "config" (servers.json) 또는 "dynamic" (register_agent)
+        self.health_url = health_url
+        self.healthy = True
+        self.outstanding = 0
+        self.served = 0
+
+    def __repr__(self) -> str:
+        state = "up" if self.healthy else "down"
+        return f"<Endpoint {self.tool} {self.url} {state} inflight={self.outstanding}>"
+
+
+class ToolRegistry:
+    """
+    툴 이름 → replica 목록.
+    - servers.json 을 감시하다가 바뀌면 다시 읽음 (hot reload)
+    - register_agent / deregister_agent 로 런타임 등록/해제
+    - 주기적인 헬스 체크 + least-outstanding-requests 로 replica 선택
+    """
+
+    def __init__(self, server_list_path: str):
+        self.server_list_path = server_list_path
+        self.endpoints: Dict[str, List[Endpoint]] = {}
+        self._mtime: Optional[float] = None
+        self.reload()
+
+    # ─── 설정 파일 ─────────────────────────────────────────────
+    def _read_config(self) -> Dict[str, List[dict]]:
+        with open(self.server_list_path, "r", encoding="utf-8") as f:
+            servers = json.load(f)
+        # JSON 은 맞지만 모양이 틀린 설정도 ValueError 로 → reload_if_changed 가 기존 설정 유지
+        if not isinstance(servers, list):
+            raise ValueError("servers.json must be a list of tool entries")
+        specs: Dict[str, List[dict]] = {}
+        for s in servers:
+            if not isinstance(s, dict) or "tool" not in s:
+                raise ValueError(f"Invalid tool entry in servers.json: {s!r}")
+            replicas = s.get("replicas")
+            if replicas is not None and not (
+                isinstance(replicas, list) and all(isinstance(r, dict) for r in replicas)
+            ):
+                raise ValueError(f"`replicas` of `{s['tool']}` must be a list of objects")
+            for r in expand_replicas(s):
+                if r.get("transport") == "inprocess":
+                    self._resolve_handler(r)
+                specs.setdefault(r["tool"], []).append(r)
+        return specs
+
+    @staticmethod
+    def _resolve_handler(spec: dict) -> None:
+        """
+        in-process 핸들러 모듈을 설정 로딩 시점에 미리 import
+        (첫 툴 호출 때 이벤트 루프 위에서 FastAPI 모듈을 import 하지 않도록).
+        import 실패는 ValueError → 잘못된 설정으로 취급해 기존 endpoint 유지
+        """
+        from mcp.inprocess import load_handler
+
+        ref = spec.get("handler")
+        if not ref:
+            raise ValueError(f"In-process tool `{spec['tool']}` needs a `handler` (module:function)")
+        try:
+            load_handler(ref)
+        except Exception as e:
+            raise ValueError(f"Cannot load in-process handler `{ref}`: {e}") from e
+
+    def reload(self) -> None:
+        """
+        servers.json 기준으로 config 출처 endpoint 를 동기화합니다.
+        이미 있던 replica 는 객체를 그대로 유지해서 inflight 카운터를 보존하고,
+        register_agent 로 들어온 dynamic endpoint 는 건드리지 않습니다.
+        """
+        mtime = os.path.getmtime(self.server_list_path)
+        specs = self._read_config()
+
+        for tool in set(self.endpoints) | set(specs):
+            current = self.endpoints.get(tool, [])
+            existing = {ep.url: ep for ep in current if ep.source == "config"}
+            merged = [ep for ep in current if ep.source != "config"]
+            for spec in specs.get(tool, []):
+                url = endpoint_url(spec)
+                ep = existing.pop(url, None)
+                if ep is None:
+                    ep = Endpoint(
+                        tool, url, source="config",
+                        transport=spec.get("transport", "http"),
+                        handler=spec.get("handler"),
+                    )
+                ep.health_url = self._health_url(spec)
+                merged.append(ep)
+            if merged:
+                self.endpoints[tool] = merged
+            else:
+                self.endpoints.pop(tool, None)
+
+        self._mtime = mtime
+        logger.info(f"[Registry] Loaded tool endpoints: {self.snapshot()}")
+
+    def reload_if_changed(self) -> bool:
+        try:
+            mtime = os.path.getmtime(self.server_list_path)
+        except OSError as e:
+            logger.warning(f"[Registry] Cannot stat {self.server_list_path}: {e}")
+            return False
+        if mtime == self._mtime:
+            return False
+        try:
+            self.reload()
+        except (OSError, ValueError, KeyError) as e:
+            # 편집 도중의 깨진 JSON 등 → 기존 설정 유지
+            # (같은 파일로 매 주기 에러를 반복하지 않도록 mtime 은 기록, 다음 수정 때 다시 시도)
+            logger.error(f"[Registry] Failed to reload {self.server_list_path}: {e}")
+            self._mtime = mtime
+            return False
+        return True
+
+    @staticmethod
+    def _health_url(spec: dict) -> Optional[str]:
+        if not spec.get("health_path") or spec.get("transport") == "inprocess":
+            return None
+        proto = "https" if spec.get("secure") else "http"
+        return f"{proto}://{spec['host']}:{spec['port']}{spec['health_path']}"
+
+    # ─── 런타임 등록/해제 ──────────────────────────────────────
+    @staticmethod
+    def _check_url(url: str) -> None:
+        """
+        register_agent 로 들어온 주소는 소켓 너머에서 온 값이므로 http(s)://host 형태만 허용
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            logger.warning(f"[Registry] Rejected endpoint {url!r}")
+            raise ValueError(f"Endpoint must be an http(s) URL with a host: {url!r}")
+
+    def register(self, tool: str, url: str, health_url: Optional[str] = None) -> Endpoint:
+        self._check_url(url)
+        if health_url:
+            self._check_url(health_url)
+        for ep in self.endpoints.get(tool, []):
+            if ep.url == url:
+                ep.healthy = True
+                if health_url:
+                    ep.health_url = health_url
+                return ep
+        ep = Endpoint(tool, url, source="dynamic", health_url=health_url)
+        self.endpoints.setdefault(tool, []).append(ep)
+        logger.info(f"[Registry] Registered {tool} → {url}")
+        return ep
+
+    def deregister(self, tool: str, url: Optional[str] = None) -> int:
+        """
+        url 이 없으면 해당 툴의 replica 전체를 해제합니다. 해제된 개수 반환.
+        """
+        current = self.endpoints.get(tool, [])
+        keep = [ep for ep in current if url is not None and ep.url != url]
+        removed = len(current) - len(keep)
+        if keep:
+            self.endpoints[tool] = keep
+        else:
+            self.endpoints.pop(tool, None)
+        logger.info(f"[Registry] Deregistered {removed} endpoint(s) of {tool}")
+        return removed
+
+    def snapshot(self) -> Dict[str, List[str]]:
+        return {tool: [ep.url for ep in eps] for tool, eps in self.endpoints.items()}
+
+    # ─── 로드 밸런싱 ───────────────────────────────────────────
+    def pick(self, tool: str) -> Endpoint:
+        eps = self.endpoints.get(tool)
+        if not eps:
+            raise RuntimeError(f"No endpoint configured for tool `{tool}`")
+        # 전부 down 이면 그래도 시도는 해본다 (헬스 체크가 틀렸을 수도 있음)
+        candidates = [ep for ep in eps if ep.healthy] or eps
+        return min(candidates, key=lambda ep: (ep.outstanding, ep.served))
+
+    @asynccontextmanager
+    async def acquire(self, tool: str):
+        ep = self.pick(tool)
+        ep.outstanding += 1
+        try:
+            yield ep
+        finally:
+            ep.outstanding -= 1
+            ep.served += 1
+
+    def mark_unhealthy(self, ep: Endpoint) -> None:
+        if ep.healthy:
+            logger.warning(f"[Registry] Marking {ep.url} unhealthy")
+        ep.healthy = False
+
+    # ─── 헬스 체크 ─────────────────────────────────────────────
+    async def _probe(self, ep: Endpoint, timeout: float) -> bool:
+        if ep.transport == "inprocess":
+            return True
+        try:
+            if ep.health_url:
+                import aiohttp
+                client_timeout = aiohttp.ClientTimeout(total=timeout)
+                async with aiohttp.ClientSession(timeout=client_timeout) as session:
+                    async with session.get(ep.health_url) as resp:
+                        return resp.status < 500
+            # health_path 가 없으면 TCP 연결 가능 여부만 확인
+            parsed = urlparse(ep.url)
+            port = parsed.port or (443 if parsed.scheme == "https" else 80)
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(parsed.hostname, port), timeout
+            )
+            writer.close()
+            await writer.wait_closed()
+            return True
+        except Exception:
+            return False
+
+    async def check_health(self, timeout: float = 2.0) -> None:
+        eps = [ep for group in self.endpoints.values() for ep in group]
+        results = await asyncio.gather(*(self._probe(ep, timeout) for ep in eps))
+        for ep, ok in zip(eps, results):
+            if ok != ep.healthy:
+                logger.info(f"[Registry] {ep.url} is now {'healthy' if ok else 'unhealthy'}")
+            ep.healthy = ok
+
+    async def watch(self, interval: float = 2.0, health_interval: float = 10.0) -> None:
+        """
+        Host 에서 백그라운드 태스크로 돌리는 루프:
+        servers.json 변경 감지 + 주기적 헬스 체크
+        """
+        elapsed = health_interval
+        while True:
+            # 한 번 실패해도 루프가 끝나지 않도록 (아무도 이 태스크를 await 하지 않음)
+            try:
+                self.reload_if_changed()
+                if elapsed >= health_interval:
+                    elapsed = 0.0
+                    await self.check_health()
+            except Exception:
+                logger.exception("[Registry] Watch iteration failed")
+            await asyncio.sleep(interval)
+            elapsed += interval
@@ -0,0 +1,222 @@
+# mcp/router.py
+
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+from llm.groq_client import acall_llm_json
+from utils.logger import logger
+
+
+class ToolDecision(BaseModel):
+    """
+    라우팅 결과: 어떤 에이전트에 어떤 payload 로 ExecuteTool 을 보낼지
+    """
+    agent: str
+    payload: Dict[str, Any]
+
+
+# 애매한 경우에만 LLM 에게 물어볼지 판단하는 키워드
+TOOL_HINTS = re.compile(
+    r'\b(weather|temperature|forecast|rain|humidity'
+    r'|wikipedia|wiki|who was|what was|what are'
+    r'|exchange|currency|convert|dollars?|won|yen|euros?)\b'
+)
+
+COUNTRY_CURRENCY = {
+    "korea": "KRW", "south korea": "KRW",
+    "japan": "JPY", "china": "CNY",
+    "us": "USD", "usa": "USD",
+    "europe": "EUR", "uk": "GBP", "canada": "CAD"
+}
+
+CURRENCY_NAMES = {
+    "dollar": "USD", "dollars": "USD", "won": "KRW", "yen": "JPY",
+    "yuan": "CNY", "euro": "EUR", "euros": "EUR", "pound": "GBP", "pounds": "GBP",
+}
+
+KNOWN_CODES = set(COUNTRY_CURRENCY.values())
+
+ROUTER_PROMPT = """You route chatbot messages to tools. Reply with a JSON object only:
+{"tool": "weather" | "wiki" | "exchange" | "none", "args": {...}}
+- weather: args {"city": "<city name>"}
+- wiki: args {"query": "<entity to look up on Wikipedia>"}
+- exchange: args {"base": "<ISO 4217 code>", "symbol": "<ISO 4217 code>"}
+- none: the message needs no tool; args {}"""
+
+
+def clean_query(text: str) -> str:
+    # 1. 소문자로 변환 후 관사 제거
+    text = text.lower()
+    text = re.sub(r'^(the|a|an)\s+', '', text)
+
+    # 2. 남은 특수문자 제거 및 공백 → `_` 변환
+    text = re.sub(r'[^\w\s]', '', text)
+    return text.strip().replace(' ', '_')
+
+
+def normalize_utterance(text: str) -> str:
+    """
+    캐시 키: 소문자 + 공백 정리 + 앞뒤 문장부호 제거
+    """
+    text = re.sub(r'\s+', ' ', text.lower()).strip()
+    return text.strip(' ?!.')
+
+
+# ─── 로컬 분류기 (regex 규칙) ────────────────────────────────
+def _weather_rule(raw: str, user_text: str) -> Optional[ToolDecision]:
+    if "weather in" not in user_text:
+        return None
+    city = re.split(r'weather in', raw, flags=re.IGNORECASE)[-1].strip()
+    city = city.rstrip("?!.").strip()
+    return ToolDecision(agent="WeatherAgent", payload={"city": city})
+
+
+def _wiki_rule(raw: str, user_text: str) -> Optional[ToolDecision]:
+    if not (any(user_text.startswith(k) for k in ("tell me about", "who is", "what is"))
+            or "from wikipedia" in user_text):
+        return None
+    # 엔티티 이름 정리
+    raw_query = re.sub(
+        r'^(tell me about|who is|what is)\s+',
+        '',
+        user_text.rstrip(' ?!'),
+        flags=re.IGNORECASE
+    )
+    return ToolDecision(agent="WikiAgent", payload={"query": clean_query(raw_query)})
+
+
+def _exchange_rule(raw: str, user_text: str) -> Optional[ToolDecision]:
+    if "exchange rate" not in user_text:
+        return None
+    txt_clean = user_text.rstrip('?.!')
+    base = symbol = None
+
+    # 1) "from USD to KRW"
+    m = re.search(r'from\s+([a-z]{3})\s+to\s+([a-z]{3})', txt_clean)
+    if m:
+        base, symbol = m.group(1).upper(), m.group(2).upper()
+
+    # 2) "USD to KRW"
+    elif re.search(r'([a-z]{3})\s+to\s+([a-z]{3})', txt_clean):
+        m2 = re.search(r'([a-z]{3})\s+to\s+([a-z]{3})', txt_clean)
+        base, symbol = m2.group(1).upper(), m2.group(2).upper()
+
+    # 3) "in korea" 스타일
+    elif re.search(r'in\s+([a-z\s]+)', txt_clean):
+        country = re.search(r'in\s+([a-z\s]+)', txt_clean).group(1).strip()
+        if country in COUNTRY_CURRENCY:
+            base, symbol = "USD", COUNTRY_CURRENCY[country]
+
+    # 4) 기본값
+    if base is None or symbol is None:
+        base, symbol = "USD", "KRW"
+    return ToolDecision(agent="ExchangeAgent", payload={"base": base, "symbol": symbol})
+
+
+LOCAL_RULES = (_weather_rule, _wiki_rule, _exchange_rule)
+
+
+def classify_local(raw: str) -> Optional[ToolDecision]:
+    user_text = raw.lower()
+    for rule in LOCAL_RULES:
+        decision = rule(raw, user_text)
+        if decision is not None:
+            return decision
+    return None
+
+
+def is_ambiguous(raw: str) -> bool:
+    """
+    규칙에는 안 걸렸지만 툴 관련 단어가 있는 메시지 → LLM 라우팅 대상
+    """
+    return TOOL_HINTS.search(raw.lower()) is not None
+
+
+def currency_code(value: Any, default: str) -> str:
+    """
+    LLM 이 준 통화 값 → ISO 4217 코드. 코드/국가명/통화명이 아니면 ValueError
+    """
+    if not value:
+        return default
+    text = str(value).strip()
+    # 이름을 먼저 봐야 "won"/"yen" 같은 세 글자 단어가 코드로 오인되지 않음
+    name = text.lower()
+    code = COUNTRY_CURRENCY.get(name) or CURRENCY_NAMES.get(name)
+    if code is not None:
+        return code
+    if text.upper() in KNOWN_CODES or re.fullmatch(r"[A-Z]{3}", text):
+        return text.upper()
+    raise ValueError(f"Unknown currency {value!r}")
+
+
+def decision_from_llm(obj: dict) -> Optional[ToolDecision]:
+    """
+    LLM JSON → ToolDecision. tool 이 "none" 이거나 인자가 비어 있으면 None (일반 응답),
+    인자가 잘못된 경우 (알 수 없는 통화 등) 는 ValueError → 캐시하지 않음
+    """
+    tool = str(obj.get("tool", "none")).lower()
+    args = obj.get("args") or {}
+    if tool == "weather" and args.get("city"):
+        return ToolDecision(agent="WeatherAgent", payload={"city": str(args["city"]).strip()})
+    if tool == "wiki" and args.get("query"):
+        return ToolDecision(agent="WikiAgent", payload={"query": clean_query(str(args["query"]))})
+    if tool == "exchange":
+        base = currency_code(args.get("base"), "USD")
+        symbol = currency_code(args.get("symbol"), "KRW")
+        return ToolDecision(agent="ExchangeAgent", payload={"base": base, "symbol": symbol})
+    return None
+
+
+class ToolRouter:
+    """
+    사용자 발화 → ToolDecision
+    1) 로컬 regex 규칙으로 확실한 경우 바로 결정
+    2) 툴 관련 단어가 없으면 LLM 호출 없이 일반 대화
+    3) 애매한 경우만 (정규화된 발화 → 결정) 캐시 확인 후 JSON mode LLM 호출
+    """
+
+    def __init__(self, cache_size: int = 1024):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Optional[ToolDecision]]" = OrderedDict()
+        self.stats = {"local": 0, "skipped": 0, "cache_hits": 0, "llm_calls": 0, "llm_errors": 0}
+
+    async def route(self, raw: str) -> Optional[ToolDecision]:
+        decision = classify_local(raw)
+        if decision is not None:
+            self.stats["local"] += 1
+            return decision
+
+        if not is_ambiguous(raw):
+            self.stats["skipped"] += 1
+            return None
+
+        key = normalize_utterance(raw)
+        if key in self._cache:
+            self.stats["cache_hits"] += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        self.stats["llm_calls"] += 1
+        try:
+            obj = await acall_llm_json(ROUTER_PROMPT, raw)
+        except Exception as e:
+            # 라우팅 실패는 캐시하지 않고 일반 대화로 처리
+            self.stats["llm_errors"] += 1
+            logger.warning(f"[Router] LLM tool selection failed: {e}")
+            return None
+
+        try:
+            decision = decision_from_llm(obj) if isinstance(obj, dict) else None
+        except ValueError as e:
+            # 스키마에 안 맞는 결정은 캐시하지 않고 일반 대화로 처리
+            self.stats["llm_errors"] += 1
+            logger.warning(f"[Router] Rejected LLM decision {obj}: {e}")
+            return None
+        logger.info(f"[Router] LLM decision for {key!r}: {decision}")
+        self._cache[key] = decision
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return decision
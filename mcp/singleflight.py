@@ -0,0 +1,64 @@
+# mcp/singleflight.py
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from mcp.message_schema import A2AMessage
+from utils.logger import logger
+
+
+def _normalize(value: Any) -> Any:
+    # 툴 인자 (도시명, 통화 코드, 위키 검색어) 는 대소문자를 구분하지 않으므로 casefold 까지
+    if isinstance(value, str):
+        return value.strip().casefold()
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def a2a_key(msg: A2AMessage) -> Hashable:
+    """
+    (보내는 에이전트, 받는 에이전트, 정규화된 payload) → single-flight 키
+    from_agent 도 포함: ToolResult 가 from_agent 앞으로 돌아가기 때문
+    """
+    payload = json.dumps(_normalize(msg.payload), sort_keys=True, ensure_ascii=False, default=str)
+    return (msg.from_agent, msg.to_agent, payload)
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출은 먼저 온 호출 하나만 실행하고
+    나머지는 그 결과(또는 예외)를 함께 받습니다.
+    실행은 별도 task 로 돌리므로 먼저 온 호출자가 취소돼도 다른 대기자는 결과를 받습니다.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {"calls": 0, "executed": 0, "collapsed": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.stats["calls"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["executed"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._done(k, t))
+        else:
+            self.stats["collapsed"] += 1
+            logger.debug(f"[SingleFlight] Joined in-flight call {key}")
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 대기자가 모두 취소된 경우에도 "exception was never retrieved" 경고가 나지 않도록
+        if not task.cancelled():
+            task.exception()
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
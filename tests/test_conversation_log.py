@@ -0,0 +1,161 @@
+# tests/test_conversation_log.py
+
+import asyncio
+import os
+
+from mcp.conversation_log import ConversationHistories, ConversationLog, SEGMENT_RE, SNAPSHOT_RE
+from mcp.message_schema import ChatMessage
+
+
+def _files(directory, pattern):
+    return sorted(n for n in os.listdir(directory) if pattern.match(n))
+
+
+def _fill(log, agent_id, count):
+    for i in range(count):
+        log.append(agent_id, [("user", f"{agent_id} message {i}")])
+
+
+def test_replay_after_compaction(tmp_path):
+    log = ConversationLog(str(tmp_path), segment_max_bytes=200, compact_after=2)
+    _fill(log, "alice", 20)
+    _fill(log, "bob", 5)
+    assert log.needs_compaction
+    log.compact()
+    log.append("alice", [("assistant", "after compaction")])
+    log.close()
+
+    # 스냅샷 하나 + 그 이후 segment 만 남음
+    assert len(_files(tmp_path, SNAPSHOT_RE)) == 1
+    reopened = ConversationLog(str(tmp_path), segment_max_bytes=200, compact_after=2)
+    alice = reopened.load("alice")
+    assert len(alice) == 21
+    assert alice[0] == ("user", "alice message 0")
+    assert alice[-1] == ("assistant", "after compaction")
+    assert len(reopened.load("bob")) == 5
+    assert reopened.load("carol") is None
+    reopened.close()
+
+
+def test_compaction_is_idempotent_across_restarts(tmp_path):
+    log = ConversationLog(str(tmp_path), segment_max_bytes=100, compact_after=2)
+    _fill(log, "alice", 10)
+    log.compact()
+    log.close()
+
+    log = ConversationLog(str(tmp_path), segment_max_bytes=100, compact_after=2)
+    _fill(log, "alice", 10)
+    log.compact()
+    assert [t[1] for t in log.load("alice")] == [f"alice message {i % 10}" for i in range(20)]
+    log.close()
+
+
+def test_torn_record_is_skipped(tmp_path):
+    log = ConversationLog(str(tmp_path))
+    _fill(log, "alice", 3)
+    log.close()
+
+    # 크래시로 마지막 줄이 중간에 잘린 상황
+    segment = os.path.join(tmp_path, _files(tmp_path, SEGMENT_RE)[-1])
+    with open(segment, "a", encoding="utf-8") as f:
+        f.write('{"a":"alice","op":"append","m":[["user","cut of')
+
+    reopened = ConversationLog(str(tmp_path))
+    assert [t[1] for t in reopened.load("alice")] == [f"alice message {i}" for i in range(3)]
+    # 재시작 후에는 새 segment 에 쓰므로 잘린 줄과 섞이지 않음
+    reopened.append("alice", [("user", "next")])
+    assert reopened.load("alice")[-1] == ("user", "next")
+    reopened.close()
+
+
+def test_reset_and_drop(tmp_path):
+    log = ConversationLog(str(tmp_path))
+    _fill(log, "alice", 3)
+    log.reset("alice", [("system", "fresh")])
+    log.append("alice", [("user", "hi")])
+    assert log.load("alice") == [("system", "fresh"), ("user", "hi")]
+
+    log.drop("alice")
+    assert log.load("alice") is None
+    log.append("alice", [("user", "again")])
+    assert log.load("alice") == [("user", "again")]
+
+    log.compact()
+    log.drop("alice")
+    log.close()
+    assert ConversationLog(str(tmp_path)).load("alice") is None
+
+
+def test_histories_write_through_and_page_in(tmp_path):
+    log = ConversationLog(str(tmp_path))
+    histories = ConversationHistories(log, idle_seconds=None)
+    histories["default"] = []
+    histories.setdefault("default", []).append(ChatMessage(role="user", content="hello"))
+    histories["default"].extend([ChatMessage(role="assistant", content="hi!")])
+    histories.pop("gone", None)
+    histories.close()
+
+    reopened = ConversationHistories(ConversationLog(str(tmp_path)), idle_seconds=None)
+    assert len(reopened) == 0
+    asyncio.run(reopened.page_in("default"))
+    assert [m.content for m in reopened["default"]] == ["hello", "hi!"]
+    assert reopened.evict_idle(0) == 1
+    assert "default" in reopened  # 메모리에서 내려가도 로그에서 다시 올라옴
+    reopened.close()
+
+
+def test_unicode_line_separators_survive_replay(tmp_path):
+    log = ConversationLog(str(tmp_path))
+    content = "line\u2028sep\u2029para\x85next"
+    log.append("alice", [("user", content), ("assistant", "ok")])
+    log.close()
+
+    reopened = ConversationLog(str(tmp_path))
+    assert reopened.load("alice") == [("user", content), ("assistant", "ok")]
+    reopened.close()
+
+
+def test_pop_paged_out_conversation(tmp_path):
+    histories = ConversationHistories(ConversationLog(str(tmp_path)))
+    histories.setdefault("alice").append(ChatMessage(role="user", content="hi"))
+    histories.evict_idle(0)
+    assert list(histories) == []
+
+    popped = histories.pop("alice")
+    assert [m.content for m in popped] == ["hi"]
+    assert histories.log.load("alice") is None
+    # 없는 대화는 drop 레코드를 쓰지 않고 default / KeyError
+    size = os.path.getsize(histories.log._file.name)
+    assert histories.pop("bob", None) is None
+    try:
+        del histories["bob"]
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("expected KeyError")
+    assert os.path.getsize(histories.log._file.name) == size
+    histories.close()
+
+
+def test_page_in_miss_avoids_sync_load(tmp_path, monkeypatch):
+    histories = ConversationHistories(ConversationLog(str(tmp_path)))
+    asyncio.run(histories.page_in("alice"))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("synchronous load after page_in miss")
+
+    monkeypatch.setattr(histories.log, "load", fail)
+    histories.setdefault("alice").append(ChatMessage(role="user", content="hi"))
+    assert [m.content for m in histories["alice"]] == ["hi"]
+    histories.close()
+
+
+def test_write_does_not_fsync_on_interval(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(os, "fsync", lambda fd: calls.append(fd))
+    log = ConversationLog(str(tmp_path), fsync_every=1000, fsync_interval=0.0)
+    _fill(log, "alice", 10)
+    assert calls == []
+    asyncio.run(log.sync_async())
+    assert len(calls) == 1
+    log.close()
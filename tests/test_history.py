@@ -0,0 +1,45 @@
+# tests/test_history.py
+
+import json
+
+from app.history import PAGE_SIZE, TOOL_MARKER, append_turn, parse_turn, render_history
+from benchmarks.bench_history_render import FakeStreamlit
+
+
+def test_parse_turn_kinds():
+    body = json.dumps({"city": "Seoul", "temp": 21.3}, indent=2)
+    assert parse_turn("assistant", f"{TOOL_MARKER}\n{body}\n") == {
+        "role": "assistant", "kind": "tool", "body": body,
+    }
+    assert parse_turn("user", "  hi  ") == {"role": "user", "kind": "chat", "body": "hi"}
+    assert parse_turn("assistant", "hello") == {"role": "assistant", "kind": "chat", "body": "hello"}
+    assert parse_turn("system", "you are a bot") is None
+
+
+def test_render_history_draws_latest_window():
+    turns = []
+    for i in range(PAGE_SIZE + 5):
+        append_turn(turns, "user", f"message {i}")
+    append_turn(turns, "system", "hidden")
+
+    st = FakeStreamlit()
+    start = render_history(st, turns, PAGE_SIZE)
+    assert start == 5
+    bodies = [body for kind, body in st.elements if kind == "markdown"]
+    assert bodies == [f"message {i}" for i in range(5, PAGE_SIZE + 5)]
+
+    st = FakeStreamlit()
+    assert render_history(st, turns, PAGE_SIZE * 2) == 0
+    assert len([e for e in st.elements if e[0] == "markdown"]) == PAGE_SIZE + 5
+
+
+def test_render_tool_turn_in_expander():
+    turns = []
+    append_turn(turns, "assistant", f"{TOOL_MARKER} plain text result")
+    st = FakeStreamlit()
+    render_history(st, turns, PAGE_SIZE)
+    assert st.elements == [
+        ("chat_message", "assistant"),
+        ("expander", "📚 출처 문서 보기"),
+        ("markdown", "plain text result"),
+    ]
@@ -0,0 +1,93 @@
+# tests/test_inprocess.py
+
+import asyncio
+
+import pytest
+from aiohttp import ClientResponseError
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from mcp.inprocess import invoke_inprocess
+
+
+class EchoRequest(BaseModel):
+    text: str
+    times: int = 1
+
+
+class EchoResponse(BaseModel):
+    text: str
+
+
+async def echo(req: EchoRequest):
+    return EchoResponse(text=req.text * req.times)
+
+
+async def not_found(req: EchoRequest):
+    raise HTTPException(status_code=404, detail="Wikipedia page not found")
+
+
+async def broken(req: EchoRequest):
+    raise RuntimeError("boom")
+
+
+def _invoke(name, args):
+    return asyncio.run(invoke_inprocess(f"{__name__}:{name}", args))
+
+
+def test_success_returns_json_compatible_dict():
+    assert _invoke("echo", {"text": "ab", "times": 2}) == {"text": "abab"}
+
+
+def test_validation_error_maps_to_422():
+    with pytest.raises(ClientResponseError) as exc:
+        _invoke("echo", {})
+    assert exc.value.status == 422
+    assert str(exc.value.request_info.url) == f"inprocess://{__name__}/echo"
+
+
+def test_http_exception_keeps_status_and_detail():
+    with pytest.raises(ClientResponseError) as exc:
+        _invoke("not_found", {"text": "x"})
+    assert exc.value.status == 404
+    assert exc.value.message == "Wikipedia page not found"
+
+
+def test_unexpected_error_maps_to_500():
+    with pytest.raises(ClientResponseError) as exc:
+        _invoke("broken", {"text": "x"})
+    assert exc.value.status == 500
+    assert "boom" in exc.value.message
+
+
+def test_real_tool_handler_errors(monkeypatch):
+    import tools.exchange_server as exchange_server
+
+    monkeypatch.setattr(exchange_server, "EXCHANGE_API_KEY", "")
+    with pytest.raises(ClientResponseError) as exc:
+        asyncio.run(invoke_inprocess("tools.exchange_server:exchange_convert", {}))
+    assert exc.value.status == 422
+    with pytest.raises(ClientResponseError) as exc:
+        asyncio.run(invoke_inprocess("tools.exchange_server:exchange_convert", {"base": "USD", "symbol": "KRW"}))
+    assert exc.value.status == 500
+
+
+def test_registry_preloads_handlers(tmp_path):
+    import json
+
+    from mcp.inprocess import load_handler
+    from mcp.registry import ToolRegistry
+
+    load_handler.cache_clear()
+    path = tmp_path / "servers.json"
+    path.write_text(json.dumps([
+        {"tool": "echo", "transport": "inprocess", "handler": f"{__name__}:echo"}
+    ]))
+    ToolRegistry(str(path))
+    assert load_handler.cache_info().currsize == 1
+
+    path.write_text(json.dumps([
+        {"tool": "echo", "transport": "inprocess", "handler": "no_such_module:echo"}
+    ]))
+    with pytest.raises(ValueError):
+        ToolRegistry(str(path))
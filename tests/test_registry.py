@@ -0,0 +1,64 @@
+# tests/test_registry.py
+
+import asyncio
+import json
+
+import pytest
+
+from mcp.manager import Manager
+from mcp.message_schema import A2AMessage
+from mcp.registry import ToolRegistry
+
+
+@pytest.fixture
+def servers(tmp_path):
+    path = tmp_path / "servers.json"
+    path.write_text(json.dumps([
+        {"tool": "weather", "host": "localhost", "port": 8000, "path": "/tools/weather/invoke"},
+    ]))
+    return str(path)
+
+
+def test_register_rejects_non_http_endpoints(servers):
+    registry = ToolRegistry(servers)
+    for url in ("ftp://10.0.0.5/invoke", "http:///invoke", "10.0.0.5:8000/invoke", "file:///etc/passwd"):
+        with pytest.raises(ValueError):
+            registry.register("weather", url)
+    with pytest.raises(ValueError):
+        registry.register("weather", "http://10.0.0.5:8000/invoke", health_url="javascript:alert(1)")
+    assert registry.snapshot() == {"weather": ["http://localhost:8000/tools/weather/invoke"]}
+
+
+def test_register_existing_endpoint_updates_health_url(servers):
+    registry = ToolRegistry(servers)
+    url = "http://10.0.0.5:8000/tools/weather/invoke"
+    first = registry.register("weather", url)
+    registry.mark_unhealthy(first)
+    again = registry.register("weather", url, health_url="http://10.0.0.5:8000/health")
+    assert again is first
+    assert again.healthy
+    assert again.health_url == "http://10.0.0.5:8000/health"
+
+
+def test_dynamic_tool_is_reachable_by_name(servers, monkeypatch):
+    manager = Manager(servers)
+    manager.registry.register("stocks", "http://10.0.0.7:9000/tools/stocks/invoke")
+    calls = []
+
+    async def fake_invoke(tool, args):
+        calls.append((tool, args))
+        return {"price": 42}
+
+    monkeypatch.setattr(manager, "_invoke_tool", fake_invoke)
+    monkeypatch.setattr(manager, "handle_message", lambda msg: asyncio.sleep(0, msg))
+    msg = A2AMessage(type="ExecuteTool", from_agent="UserAgent", to_agent="stocks", payload={"symbol": "ACME"})
+    result = asyncio.run(manager.send_to_agent(msg))
+
+    assert calls == [("stocks", {"symbol": "ACME"})]
+    assert result.type == "ToolResult"
+    assert result.from_agent == "stocks"
+    assert result.payload == {"result": {"price": 42}}
+
+    unknown = A2AMessage(type="ExecuteTool", from_agent="UserAgent", to_agent="nope", payload={})
+    with pytest.raises(RuntimeError):
+        asyncio.run(manager.send_to_agent(unknown))
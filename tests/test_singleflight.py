@@ -0,0 +1,83 @@
+# tests/test_singleflight.py
+
+import asyncio
+
+import pytest
+
+from mcp.message_schema import A2AMessage
+from mcp.singleflight import SingleFlight, a2a_key
+
+
+def _execute(payload, to_agent="WeatherAgent"):
+    return A2AMessage(type="ExecuteTool", from_agent="UserAgent", to_agent=to_agent, payload=payload)
+
+
+def test_key_ignores_whitespace_case_and_key_order():
+    a = a2a_key(_execute({"city": " Seoul", "units": "metric"}))
+    b = a2a_key(_execute({"units": "METRIC", "city": "seoul "}))
+    assert a == b
+    assert a2a_key(_execute({"city": "Busan"})) != a2a_key(_execute({"city": "Seoul"}))
+    assert a2a_key(_execute({"city": "Seoul"}, "WikiAgent")) != a2a_key(_execute({"city": "Seoul"}))
+
+
+def test_concurrent_calls_share_one_result():
+    async def scenario():
+        sf = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"temp": 21}
+
+        results = await asyncio.gather(*(sf.do("k", fetch) for _ in range(5)))
+        return sf, calls, results
+
+    sf, calls, results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert results == [{"temp": 21}] * 5
+    assert sf.stats == {"calls": 5, "executed": 1, "collapsed": 4}
+    assert sf.inflight == 0
+
+
+def test_error_fans_out_to_every_waiter():
+    async def scenario():
+        sf = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("tool down")
+
+        results = await asyncio.gather(*(sf.do("k", fail) for _ in range(3)), return_exceptions=True)
+        return sf, results
+
+    sf, results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) and str(r) == "tool down" for r in results)
+    assert sf.stats["executed"] == 1
+    assert sf.inflight == 0
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    async def scenario():
+        sf = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "ok"
+
+        leader = asyncio.ensure_future(sf.do("k", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(sf.do("k", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return sf, await follower
+
+    sf, result = asyncio.run(scenario())
+    assert result == "ok"
+    assert sf.stats["executed"] == 1
+    assert sf.inflight == 0
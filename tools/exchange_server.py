@@ -3,12 +3,10 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import httpx
-import os
-import traceback
 import logging
-from dotenv import load_dotenv
 
-load_dotenv()
+from utils.settings import EXCHANGE_API_KEY
+
 app = FastAPI()
 logger = logging.getLogger("exchange")
 logging.basicConfig(level=logging.INFO)
@@ -21,7 +19,7 @@ class ConvertRequest(BaseModel):
 @app.post("/tools/exchange/invoke")
 async def exchange_convert(req: ConvertRequest):
     try:
-        api_key = os.getenv("EXCHANGE_API_KEY")
+        api_key = EXCHANGE_API_KEY
         if not api_key:
             raise HTTPException(status_code=500, detail="Missing EXCHANGE_API_KEY env var")
 
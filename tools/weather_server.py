@@ -1,16 +1,9 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import httpx
-import os
 import logging
-from dotenv import load_dotenv
 
-# .env 파일 로드
-load_dotenv(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.env')))
-
-OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
-if not OPENWEATHER_API_KEY:
-    raise RuntimeError("OPENWEATHER_API_KEY not set in .env")
+from utils.settings import OPENWEATHER_API_KEY
 
 app = FastAPI()
 logger = logging.getLogger("weather_server")
@@ -27,6 +20,10 @@ class WeatherResponse(BaseModel):
 
 @app.post("/tools/weather/invoke", response_model=WeatherResponse)
 async def weather_invoke(req: WeatherRequest):
+    # 키 누락은 import 시점이 아니라 요청 시점에 에러로 (exchange_server 와 동일)
+    if not OPENWEATHER_API_KEY:
+        raise HTTPException(status_code=500, detail="OPENWEATHER_API_KEY not set in .env")
+
     city = req.city
     api_uri = (
         f"http://api.openweathermap.org/data/2.5/weather"
@@ -1,11 +1,35 @@
 # utils/settings.py
+#
+# .env 는 여기서 한 번만 읽습니다. 다른 모듈은 os.getenv / load_dotenv 대신
+# 이 모듈의 값을 가져다 쓰세요.
 
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+load_dotenv(os.path.join(PROJECT_ROOT, ".env"))
+
+# GroqCloud (LLM)
+GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
+GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
 
 # OpenWeatherMap API key
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
 
-# Wikipedia API doesn’t need a key
\ No newline at end of file
+# exchangerate.host API key
+EXCHANGE_API_KEY = os.getenv("EXCHANGE_API_KEY", "")
+
+# Wikipedia API doesn’t need a key
+
+# MCP Host
+MCP_HOST = os.getenv("MCP_HOST", "localhost")
+MCP_PORT = int(os.getenv("MCP_PORT", 8080))
+
+# 대화 로그 디렉터리 (비어 있으면 메모리에만 보관)
+CONVERSATION_LOG_DIR = os.getenv("CONVERSATION_LOG_DIR", "")
+# 이 시간(초) 동안 안 쓰인 대화는 메모리에서 내림 (로그에서 다시 리플레이)
+HISTORY_IDLE_SECONDS = float(os.getenv("HISTORY_IDLE_SECONDS", 600))
+
+# 툴 서버 설정 (예시)
+TOOL_BASE_URL = os.getenv("TOOL_BASE_URL", "http://localhost:8000/tools")